@@ -546,6 +546,9 @@ class BrowserAgentHandler:
             browser_ids = list(self._browsers.keys())
             for browser_id in browser_ids:
                 await self.close_browser(browser_id)
+
+            # Browsers leave the shared Playwright driver running; stop it last
+            await StealthBrowser.shutdown()
                 
             logger.info("All browsers and resources cleaned up successfully")
         except Exception as e:
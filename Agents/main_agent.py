@@ -15,7 +15,7 @@ from langgraph.graph.graph import CompiledGraph
 from langchain_core.messages import HumanMessage, AIMessage
 from browser_use import ActionResult, AgentHistoryList
 # from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from Utils.prompts import (
     FILLER_PROMPT,
     THINKER_PROMPT,
@@ -25,6 +25,7 @@ from Utils.structured_llm import StructuredLLMHandler
 from Utils.routing_module import InternalState, Router, RouteConfig
 from Utils.schemas import (
     Task, 
+    TaskPriority,
     ResearchResult
 )
 from textwrap import dedent
@@ -35,7 +36,7 @@ logger = logging.getLogger("AutoAgent")
 
 
 VALIDATION_PROMPT = dedent("""
-You are a Validator Agent with the following responsibility: after the main browser agent has executed a user-requested task, you must verify whether the task has been completed successfully. You will be provided with two inputs: the original {user_task} and the {agent_response} generated by the browser agent.
+You are a Validator Agent with the following responsibility: after the main browser agent has executed a user-requested task, you must verify whether the task has been completed successfully. You will be provided with two inputs, listed at the end of this prompt: the original user task and the agent response generated by the browser agent.
 
 Your tasks are as follows:
 
@@ -65,6 +66,7 @@ The agent response is:
 
 class ThinkerOutputStruct(BaseModel):
     """Pydantic model for the task analyzer response."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
     
     task_type: Literal["OTHER", "FORM", "RESEARCH"] = Field(
         description="Type of task: FORM for web form filling actions, RESEARCH for information gathering tasks, OTHER for any other simple action type of task.",
@@ -663,6 +665,7 @@ class AutoAgent:
                     task = Task(
                         website=task_data["website"],
                         task_description=task_data["task_description"],
+                        constraints=task_data.get("constraints", []),
                         priority=priority,
                         validation_rules=task_data.get("validation_rules", [])
                     )
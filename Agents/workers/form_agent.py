@@ -15,7 +15,7 @@ from langgraph.graph.graph import CompiledGraph
 from langchain_core.messages import HumanMessage, AIMessage
 from browser_use import ActionResult, AgentHistoryList
 # from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from Utils.prompts import (
     THINKER_PROMPT,
     EXEPROMPT,
@@ -56,8 +56,10 @@ class ThinkerOutputStruct(BaseModel):
     )
     
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra='ignore',
+        json_schema_extra={
             "example": {
                 "task_type": "ACTION",
                 "refined_task": "Purchase a t-shirt online that matches the user's preferences",
@@ -75,7 +77,8 @@ class ThinkerOutputStruct(BaseModel):
                     "Requires shipping address"
                 ]
             }
-        }
+        },
+    )
 
 class NextInstruction(BaseModel):
     instruction : str = Field(description="This field contains the new instruction that should be taken")
@@ -1,9 +1,7 @@
-from re import template
 from textwrap import dedent
 from browser_use import SystemPrompt
 from langchain_core.messages import SystemMessage
-from overrides import overrides
-from langchain.prompts import PromptTemplate
+from typing_extensions import override
 
 system_prompt = dedent("""
 # Web AI Agent - Task Automation System
@@ -117,25 +115,47 @@ You can specify multiple sequential actions (maximum defined by `{max_actions}`)
 
 
 class MySystemPrompt(SystemPrompt):
-    @overrides
+    # Rendered messages keyed by max_actions_per_step, shared across agents
+    _MSG_CACHE: dict[int, SystemMessage] = {}
+    # browser_use's own template, read from its package once per process
+    _BASE_TEMPLATE: str | None = None
+
+    def _load_prompt_template(self) -> None:
+        if MySystemPrompt._BASE_TEMPLATE is None:
+            super()._load_prompt_template()
+            MySystemPrompt._BASE_TEMPLATE = self.prompt_template
+        self.prompt_template = MySystemPrompt._BASE_TEMPLATE
+
+    @override
     def get_system_message(self) -> SystemMessage:
-        
-        # Get existing rules from parent class
-        sys_prompt = self.prompt_template.format(max_actions=self.max_actions_per_step)
-      #   prompt = PromptTemplate(
-      #      template = system_prompt
-      #   )
-      #   sys_prompt = prompt.format(max_actions=self.max_actions_per_step)
-      #   # Add your custom rules
-        new_prompt = """
-            10. MOST IMPORTANT RULE:
-            - You MUST always get the user information from the provided tool, or ask the user.
-            - Never Ever Assume any informtation of your own, Always ask the user.
-            - If you do not have the information "done" the task.
-        """
-
-        # Make sure to use this pattern otherwise the exiting rules will be lost
-        return SystemMessage(content=sys_prompt)
+        msg = self._MSG_CACHE.get(self.max_actions_per_step)
+        if msg is None:
+            # Formatted once per max_actions_per_step; later steps reuse the message
+            sys_prompt = self.prompt_template.format(max_actions=self.max_actions_per_step)
+            msg = SystemMessage(content=sys_prompt)
+            self._MSG_CACHE[self.max_actions_per_step] = msg
+        return msg
+
+
+class CachedSystemPrompt(MySystemPrompt):
+    """
+    MySystemPrompt for Anthropic models, with the system message marked as a
+    prompt-cache checkpoint so repeated agent steps read it from the cache.
+    """
+    _CACHED_MSG_CACHE: dict[int, SystemMessage] = {}
+
+    @override
+    def get_system_message(self) -> SystemMessage:
+        msg = self._CACHED_MSG_CACHE.get(self.max_actions_per_step)
+        if msg is None:
+            text = super().get_system_message().content
+            msg = SystemMessage(content=[{
+                "type": "text",
+                "text": text,
+                "cache_control": {"type": "ephemeral"},
+            }])
+            self._CACHED_MSG_CACHE[self.max_actions_per_step] = msg
+        return msg
     
     
 THINKER_PROMPT = dedent("""
@@ -252,18 +272,16 @@ USER TASK:
 """)
 
 
-EXEPROMPT = dedent("""
+# Static scaffolding comes first and the per-call fields are appended at the
+# tail, so providers that cache prompt prefixes can reuse everything above.
+_EXEPROMPT_STATIC = dedent("""
 You are an advanced and reliable LLM agent responsible for validating and strategizing the next steps in a complex web automation task. Your role is to ensure that the user-provided task is completed successfully or to adapt the instructions in response to errors or unexpected conditions reported by the browser automation agent. The next action you generate will be performed by the browser agent. Be precise, action-focused, and do not hallucinate.
 
 ### Context:
-1. **User Task**: {task}  
-   - The high-level goal provided by the user that the automation process is trying to achieve.
-
-2. **Current Instruction**: {previous_step}  
-   - The last nucleus instruction generated and executed by the browser automation agent.
-
-3. **Browser Agent Result**: {agent_response}  
-   - The outcome of executing the current instruction, including success messages, error details, or unexpected conditions.
+The context for the current step is provided at the end of this prompt:
+1. **User Task**: The high-level goal provided by the user that the automation process is trying to achieve.
+2. **Current Instruction**: The last nucleus instruction generated and executed by the browser automation agent.
+3. **Browser Agent Result**: The outcome of executing the current instruction, including success messages, error details, or unexpected conditions.
 
 ### Requirements:
 #### 1. Validation and Status:
@@ -309,10 +327,24 @@ You are an advanced and reliable LLM agent responsible for validating and strate
 - Anticipate and address edge cases systematically.
 - Use clear and user-friendly language in the `final_response`.
 - Do not hallucinate – use only the provided context and do not introduce unverified details.
+""")
+
+_EXEPROMPT_DYNAMIC = dedent("""
+---
+### User Task:
+{task}
+
+### Current Instruction:
+{previous_step}
+
+### Browser Agent Result:
+{agent_response}
 
 Proceed by validating the current task status and generating the appropriate response.
 """)
 
+EXEPROMPT = _EXEPROMPT_STATIC + _EXEPROMPT_DYNAMIC
+
 
     
 FILLER_PROMPT = dedent("""
@@ -347,4 +379,4 @@ FILLER_PROMPT = dedent("""
 
     And here is the user information:
     {user_info}
-""")
\ No newline at end of file
+""")
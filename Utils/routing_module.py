@@ -1,14 +1,25 @@
-from typing import Dict, List, Callable, Optional, Any, Union
-from pydantic import BaseModel, Field
+from typing import Dict, List, Callable, Optional, Any, Tuple, Union
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from langgraph.types import Send
-from enum import Enum
+from enum import IntEnum
 import logging
+import sys
 from functools import wraps
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR)
 LOGGER = logging.getLogger(__name__)
 
+__all__ = [
+    "Router",
+    "RouteConfig",
+    "InternalState",
+    "RouteType",
+    "RouterException",
+    "RouteConfigurationError",
+    "RouteNotFoundError",
+]
+
 class RouterException(Exception):
     """Base exception class for Router-related errors"""
     pass
@@ -21,36 +32,50 @@ class RouteNotFoundError(RouterException):
     """Raised when a requested route is not found"""
     pass
 
-class RouteType(Enum):
+class RouteType(IntEnum):
     """Enum for different types of routing"""
-    DIRECT = "direct"
-    CONDITIONAL = "conditional"
-    SEND = "send"
+    DIRECT = 0
+    CONDITIONAL = 1
+    SEND = 2
 
 class InternalState(BaseModel):
     """
     Base model for internal state management
     """
+    model_config = ConfigDict(frozen=True, extra='ignore', arbitrary_types_allowed=True)
+
     data: Dict[str, Any] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
-    class Config:
-        arbitrary_types_allowed = True
-
     def __init__(self, **kwargs):
-        super().__init__()
-        self.data.update(kwargs)
+        super().__init__(data=kwargs)
 
 class RouteConfig(BaseModel):
     """
     Configuration model for route definitions
     """
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     from_node: str
-    direct_nodes: Optional[List[str]] = Field(default_factory=list)
-    conditional_nodes: Optional[List[str]] = Field(default_factory=list)
+    direct_nodes: Tuple[str, ...] = ()
+    conditional_nodes: Tuple[str, ...] = ()
     send: bool = False
     send_to: Optional[str] = None
 
+    @field_validator('from_node', 'send_to')
+    @classmethod
+    def _intern_node(cls, node: Optional[str]) -> Optional[str]:
+        """Intern node names so routing lookups can match by identity."""
+        return sys.intern(node) if node is not None else None
+
+    @field_validator('direct_nodes', 'conditional_nodes', mode='before')
+    @classmethod
+    def _intern_nodes(cls, nodes: Any) -> Any:
+        """Store node lists as tuples of interned names."""
+        if nodes is None:
+            return ()
+        return tuple(sys.intern(node) if isinstance(node, str) else node for node in nodes)
+
 
 class Router:
     """
@@ -59,18 +84,24 @@ class Router:
     This class handles routing logic between nodes, supporting direct routing,
     conditional routing, and state sending between nodes.
     """
-    
-    _route_registry: Dict[str, Callable] = {}
 
-    def __init__(self, name: str):
+    # Number of internal states packed into one Send; None sends one per state
+    batch_size: Optional[int] = None
+
+    def __init__(self, name: str, batch_size: Optional[int] = None):
         """
         Initialize Router instance.
         
         Args:
             name (str): Unique identifier for the router instance
+            batch_size (Optional[int]): If set, send routes emit one Send per
+                batch of internal states under the "internal_states" key
         """
         self.name = name
         self._validate_name(name)
+        if batch_size is not None:
+            self.batch_size = batch_size
+        self._route_registry: Dict[str, Callable] = {}
 
     @staticmethod
     def _validate_name(name: str) -> None:
@@ -100,9 +131,8 @@ class Router:
         if not all(isinstance(node, str) and node for node in nodes):
             raise RouteConfigurationError("All node names must be non-empty strings")
 
-    @classmethod
     def _create_routing_function(
-        cls,
+        self,
         from_node :str
     ) -> Callable:
         """
@@ -115,36 +145,56 @@ class Router:
         Returns:
             Callable: Wrapped routing function
         """
-        @wraps(cls._create_routing_function)
+        batch_size = self.batch_size
+
+        @wraps(self._create_routing_function)
         def routing_function(state):
+            # The config is written by the node at runtime, so it is read
+            # from the state once per call and destructured into locals.
             config :RouteConfig = state.route_config[from_node]
             try:
                 if config.send:
+                    # Bind lookups once, outside the fan-out comprehension
+                    send_to = config.send_to
+                    make_send = Send
+                    if batch_size:
+                        internal_states = list(state.send_list.get(from_node, ()))
+                        return [
+                            make_send(
+                                send_to,
+                                {"internal_states": internal_states[i:i + batch_size]}
+                            )
+                            for i in range(0, len(internal_states), batch_size)
+                        ]
                     return [
-                        Send(
-                            config.send_to,
+                        make_send(
+                            send_to,
                             {"internal_state": internal_state}
                         )
-                        for internal_state in state.send_list.get(from_node, [])
+                        for internal_state in state.send_list.get(from_node, ())
                     ]
                 
                 next_nodes = []
                 if hasattr(state, 'routes'):
-                    selected_nodes = state.routes.get(from_node, [])
-                    next_nodes.extend(
+                    # Filter the configured nodes so the result keeps their
+                    # order and lists each node once, however it was selected
+                    selected = set(state.routes.get(from_node, ()))
+                    next_nodes = [
                         node for node in config.conditional_nodes
-                        if node in selected_nodes
-                    )
+                        if node in selected
+                    ]
                 
 
-                # LOGGER.debug(
-                #     f"Routing from {config.from_node} to nodes: {next_nodes}"
-                # )
+                if LOGGER.isEnabledFor(logging.DEBUG):
+                    LOGGER.debug(
+                        "Routing from %s to nodes: %s", config.from_node, next_nodes
+                    )
                 return next_nodes
 
             except Exception as e:
                 LOGGER.error(
-                    f"Error in routing function for {config.from_node}: {str(e)}",
+                    "Error in routing function for %s: %s",
+                    config.from_node, e,
                     exc_info=True
                 )
                 raise RouterException(
@@ -153,9 +203,8 @@ class Router:
 
         return routing_function
 
-    @classmethod
     def get_routing_function(
-        cls,
+        self,
         from_node: str,
     ) -> bool:
         """
@@ -176,19 +225,26 @@ class Router:
             RouteConfigurationError: If route configuration is invalid
         """
         try:
-            # if from_node not in cls._route_registry:
+            # if from_node not in self._route_registry:
             #     raise RouteNotFoundError(
             #         f"No routing function found for {from_node}"
             #     )
-            routing_func = cls._create_routing_function(from_node)
-            cls._route_registry[from_node] = routing_func
+            from_node = sys.intern(from_node)
+            # The closure reads the route config from the state at call time,
+            # so one built for this node stays valid across compiles
+            existing = self._route_registry.get(from_node)
+            if existing is not None:
+                return existing
+            routing_func = self._create_routing_function(from_node)
+            self._route_registry[from_node] = routing_func
 
             # LOGGER.info(f"Successfully created router for {from_node}")
             return routing_func
 
         except Exception as e:
             LOGGER.error(
-                f"Failed to create router for {from_node}: {str(e)}",
+                "Failed to create router for %s: %s",
+                from_node, e,
                 exc_info=True
             )
             raise e 
@@ -196,9 +252,7 @@ class Router:
             #     f"Failed to create router for '{from_node}'"
             # ) from e
 
-    @classmethod
-    def clear_routes(cls) -> None:
-        """Clear all registered routes and configurations"""
-        cls._route_registry.clear()
-        cls._route_configs.clear()
+    def clear_routes(self) -> None:
+        """Clear all registered routes"""
+        self._route_registry.clear()
         # LOGGER.info("Cleared all routes and configurations")
\ No newline at end of file
@@ -1,9 +1,17 @@
-from enum import Enum, auto
-from pydantic import BaseModel, Field
+from enum import Enum
+from pydantic import BaseModel, ConfigDict, Field
 from typing_extensions import Optional,List,Dict,Any
 
+class TaskPriority(str, Enum):
+    """Priority levels for tasks created from research results"""
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
 class ResearchResult(BaseModel):
     """Model for search results from research phase"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     url: str
     title: str
     description: str
@@ -11,10 +19,17 @@ class ResearchResult(BaseModel):
     
 class Task(BaseModel):
     """Model for a specific task to execute"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     task_description: str
     constraints : List[str]
+    website: Optional[str] = None
+    priority: TaskPriority = TaskPriority.MEDIUM
+    validation_rules: List[str] = Field(default_factory=list)
 
 class WebSocketMessage(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     type: str
     content: Dict[str, Any]
     session_id: str
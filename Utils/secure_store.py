@@ -1,14 +1,17 @@
 import os
+import atexit
 import logging
+import threading
 from typing import Optional, Any
-import json
+import orjson
 import base64
+import hashlib
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from dotenv import load_dotenv
 load_dotenv()
 
+_init_lock = threading.Lock()
+
 
 class SecureStore:
     """
@@ -18,77 +21,203 @@ class SecureStore:
     with fallback mechanisms and proper error handling.
     """
     _instance = None
+    _ready_instance = None
     _logger = logging.getLogger(__name__)
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(SecureStore, cls).__new__(cls)
-            cls._instance._initialized = False
+            with _init_lock:
+                if cls._instance is None:
+                    instance = super(SecureStore, cls).__new__(cls)
+                    instance._initialized = False
+                    cls._instance = instance
         return cls._instance
     
     def __init__(self):
+        # Lock-free fast path once initialized; the lock only serializes first use
         if self._initialized:
             return
-            
-        self._initialized = True
-        self._encryption_key = os.getenv("SECURE_STORE_KEY")
-        self._storage_path = os.getenv("SECURE_STORE_PATH", "./.secure_storage")
-        self._cached_credentials = {}
-        
-        # Initialize encryption if key is available
-        self._fernet = None
-        if self._encryption_key:
-            try:
-                # Generate key from password
-                kdf = PBKDF2HMAC(
-                    algorithm=hashes.SHA256(),
-                    length=32,
-                    salt=b'static_salt_for_demo',  # In production, use a proper salt strategy
-                    iterations=100000,
-                )
-                key = base64.urlsafe_b64encode(kdf.derive(self._encryption_key.encode()))
-                self._fernet = Fernet(key)
-            except Exception as e:
-                self._logger.error(f"Failed to initialize encryption: {str(e)}")
-        
-        # Load cached credentials if available
-        self._load_cached_credentials()
+        with _init_lock:
+            if self._initialized:
+                return
+
+            self._encryption_key = os.getenv("SECURE_STORE_KEY")
+            self._storage_path = os.getenv("SECURE_STORE_PATH", "./.secure_storage")
+            # Opt-in only: the cache holds usable keys indexed by an unsalted SHA-256
+            # of the password, which lets anyone who reads it test password guesses
+            # far more cheaply than PBKDF2 allows. Enable only where the file is as
+            # well protected as the store itself.
+            self._kdf_cache_path = os.getenv("SECURE_STORE_KDF_CACHE")
+            self._cached_credentials = {}
+            self._env_cache = {}
+            self._dirty = False
+            self._flush_timer = None
+            self._flush_lock = threading.Lock()
+
+            # Initialize encryption if key is available
+            self._fernet = None
+            if self._encryption_key:
+                try:
+                    self._fernet = Fernet(self._derive_key())
+                except Exception as e:
+                    self._logger.error(f"Failed to initialize encryption: {str(e)}")
+
+            # Load cached credentials if available
+            self._load_cached_credentials()
+            atexit.register(self._flush)
+            self._initialized = True
+            SecureStore._ready_instance = self
     
+    def _derive_key(self) -> bytes:
+        """
+        Derive the Fernet key from the encryption password.
+
+        When SECURE_STORE_KDF_CACHE names a file, derived keys are kept there
+        keyed by a SHA-256 fingerprint of the password, so later process starts
+        skip the PBKDF2 run. The file holds usable keys and its fingerprints
+        are a cheap password-guessing oracle, so it is written with owner-only
+        permissions and ignored if it is readable by anyone else; leave the
+        variable unset to always derive.
+        """
+        fingerprint = hashlib.sha256(self._encryption_key.encode()).hexdigest()
+        kdf_cache = self._read_kdf_cache()
+        if fingerprint in kdf_cache:
+            return kdf_cache[fingerprint].encode()
+
+        # Generate key from password (hashlib goes straight to OpenSSL's PBKDF2)
+        raw_key = hashlib.pbkdf2_hmac(
+            'sha256',
+            self._encryption_key.encode(),
+            b'static_salt_for_demo',  # In production, use a proper salt strategy
+            100000,
+            32,
+        )
+        key = base64.urlsafe_b64encode(raw_key)
+
+        if self._kdf_cache_path:
+            kdf_cache[fingerprint] = key.decode()
+            self._write_kdf_cache(kdf_cache)
+        return key
+
+    def _read_kdf_cache(self) -> dict:
+        """Read the derived-key cache, returning an empty mapping if unavailable."""
+        if not self._kdf_cache_path or not os.path.exists(self._kdf_cache_path):
+            return {}
+        try:
+            with open(self._kdf_cache_path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if st.st_mode & 0o077 or (hasattr(os, 'getuid') and st.st_uid != os.getuid()):
+                    self._logger.warning(
+                        f"Ignoring KDF cache {self._kdf_cache_path}: must be owned by this user with mode 0600"
+                    )
+                    return {}
+                return orjson.loads(f.read())
+        except Exception as e:
+            self._logger.warning(f"Ignoring unreadable KDF cache: {str(e)}")
+            return {}
+
+    def _write_kdf_cache(self, kdf_cache: dict) -> None:
+        """Persist the derived-key cache with owner-only permissions."""
+        try:
+            cache_dir = os.path.dirname(self._kdf_cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            fd = os.open(self._kdf_cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            # The creation mode does not apply to an existing file, so tighten it explicitly
+            if hasattr(os, 'fchmod'):
+                os.fchmod(fd, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(kdf_cache))
+        except Exception as e:
+            self._logger.warning(f"Failed to write KDF cache: {str(e)}")
+
     def _load_cached_credentials(self) -> None:
         """Load credentials from encrypted storage if available."""
-        if not os.path.exists(self._storage_path):
+        if not self._fernet or not os.path.exists(self._storage_path):
             return
             
         try:
             with open(self._storage_path, 'rb') as f:
                 encrypted_data = f.read()
-                
-            if self._fernet:
-                decrypted_data = self._fernet.decrypt(encrypted_data).decode('utf-8')
-                self._cached_credentials = json.loads(decrypted_data)
-                self._logger.info(f"Loaded {len(self._cached_credentials)} credentials from secure storage")
+
+            self._cached_credentials = orjson.loads(self._fernet.decrypt(encrypted_data))
+            self._logger.info(f"Loaded {len(self._cached_credentials)} credentials from secure storage")
         except Exception as e:
             self._logger.error(f"Failed to load cached credentials: {str(e)}")
     
-    def _save_cached_credentials(self) -> None:
-        """Save credentials to encrypted storage."""
+    def _save_cached_credentials(self) -> bool:
+        """
+        Save credentials to encrypted storage.
+
+        Returns:
+            bool: True if the credentials were written, False otherwise.
+        """
         if not self._fernet:
             self._logger.warning("Encryption key not available, skipping credential caching")
-            return
+            return False
             
         try:
-            encrypted_data = self._fernet.encrypt(json.dumps(self._cached_credentials).encode('utf-8'))
+            encrypted_data = self._fernet.encrypt(orjson.dumps(self._cached_credentials))
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self._storage_path), exist_ok=True)
+            # Ensure directory exists (a bare filename has no directory component)
+            storage_dir = os.path.dirname(self._storage_path)
+            if storage_dir:
+                os.makedirs(storage_dir, exist_ok=True)
             
-            with open(self._storage_path, 'wb') as f:
+            # Write to a temp file and swap it in so a crash never leaves a partial blob
+            tmp_path = self._storage_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
                 f.write(encrypted_data)
+            os.replace(tmp_path, self._storage_path)
                 
             self._logger.info(f"Saved {len(self._cached_credentials)} credentials to secure storage")
+            return True
         except Exception as e:
             self._logger.error(f"Failed to save cached credentials: {str(e)}")
+            return False
     
+    def _schedule_flush(self) -> None:
+        """Mark the cache dirty and write it out shortly, coalescing bursts of updates."""
+        with self._flush_lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(0.5, self._flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _flush(self) -> bool:
+        """
+        Write pending credential changes to encrypted storage.
+
+        A failed write leaves the changes pending for the next flush.
+
+        Returns:
+            bool: True if nothing is left pending, False if the write failed.
+        """
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return True
+            self._dirty = not self._save_cached_credentials()
+            return not self._dirty
+
+    @classmethod
+    def flush(cls) -> bool:
+        """
+        Immediately persist any buffered credential changes.
+
+        Returns:
+            bool: True if all changes are on disk, False if the write failed.
+        """
+        return (cls._ready_instance or cls())._flush()
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget memoized environment lookups so changed variables are re-read."""
+        (cls._ready_instance or cls())._env_cache.clear()
+
     @classmethod
     def get_credential(cls, key: str, default: Optional[Any] = None) -> str:
         """
@@ -104,19 +233,23 @@ class SecureStore:
         Raises:
             ValueError: If credential not found and no default provided.
         """
-        instance = cls()
+        instance = cls._ready_instance or cls()
         
         # Try to get from cache first
         if key in instance._cached_credentials:
             return instance._cached_credentials[key]
         
-        # Then try environment variables
-        value = os.getenv(key)
+        # Then try environment variables, remembering hits
+        value = instance._env_cache.get(key)
+        if value is None:
+            value = os.getenv(key)
+            if value is not None:
+                instance._env_cache[key] = value
         if value is not None:
             # Cache the value if encryption is available
             if instance._fernet:
                 instance._cached_credentials[key] = value
-                instance._save_cached_credentials()
+                instance._schedule_flush()
             return value
         
         # Return default or raise error
@@ -126,27 +259,34 @@ class SecureStore:
         raise ValueError(f"Credential '{key}' not found in environment variables or secure storage.")
     
     @classmethod
-    def store_credential(cls, key: str, value: str) -> bool:
+    def store_credential(cls, key: str, value: str, durable: bool = False) -> bool:
         """
         Store a credential securely.
+
+        Writes are buffered and flushed to disk shortly after; pass durable=True
+        to write synchronously before returning.
         
         Args:
             key (str): The key identifying the credential.
             value (str): The credential value to store.
+            durable (bool): Whether to wait until the credential is on disk.
             
         Returns:
-            bool: True if stored successfully, False otherwise.
+            bool: True if the credential was buffered (or, with durable=True,
+            written to disk), False otherwise.
         """
-        instance = cls()
+        instance = cls._ready_instance or cls()
         
         if not instance._fernet:
             instance._logger.warning(f"Encryption not available, credential '{key}' not stored")
             return False
-        
-        try:
+
+        # Idempotent stores are common from retry loops; skip the rewrite
+        if instance._cached_credentials.get(key) != value:
             instance._cached_credentials[key] = value
-            instance._save_cached_credentials()
-            return True
-        except Exception as e:
-            instance._logger.error(f"Failed to store credential '{key}': {str(e)}")
-            return False
\ No newline at end of file
+            instance._schedule_flush()
+
+        if durable and not instance._flush():
+            instance._logger.error(f"Failed to store credential '{key}'")
+            return False
+        return True
\ No newline at end of file
@@ -1,13 +1,13 @@
-from math import e
 from playwright.async_api import async_playwright
 from playwright.async_api import Browser as PlaywrightBrowser
 from browser_use import BrowserConfig, Browser
 import asyncio
-import random
 import logging
-from proto import Field
+from collections import deque
+from weakref import WeakKeyDictionary
+import numpy as np
 from pydantic import BaseModel,Field
-from typing import Optional, List
+from typing import Any, Optional, List
 
 # Configure logging
 logging.basicConfig(
@@ -16,9 +16,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Chromium flags for stealth launches; static, unique and order-stable
+_STEALTH_LAUNCH_ARGS = (
+    '--disable-blink-features=AutomationControlled',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--disable-site-isolation-trials',
+    '--disable-features=UserAgentClientHint',
+    '--no-sandbox',
+    '--disable-webgl',
+    '--disable-threaded-scrolling',
+    '--disable-threaded-animation',
+    '--disable-extensions',
+)
+
+# Navigator overrides applied to every stealth context, in a single defineProperties call
+_STEALTH_INIT_SCRIPT = """
+Object.defineProperties(navigator, {
+    webdriver: { get: () => undefined },
+    languages: { get: () => ['en-US', 'en'] },
+    plugins: {
+        get: () => [
+            {
+                name: 'Chrome PDF Plugin',
+                description: 'Portable Document Format',
+                filename: 'internal-pdf-viewer'
+            }
+        ]
+    }
+});
+"""
 
 
 class StealthBrowser(Browser):
+    """
+    Chromium browser with anti-detection launch flags and context overrides.
+
+    Human-like timing is applied only at interaction points (typing, clicks,
+    navigation) through random_delay; the browser is launched without slow_mo
+    so selector queries and evaluate calls run at full speed.
+
+    All instances running on the same event loop share one Playwright driver
+    process; call shutdown() from that loop at teardown to stop it.
+    """
+    # Driver and its start lock per event loop, so neither is tied to the first loop used
+    _shared_playwright: "WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = WeakKeyDictionary()
+    _shared_playwright_locks: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = WeakKeyDictionary()
+
     def __init__(self, config : BrowserConfig):
         super().__init__()
         # self.playwright = None
@@ -26,25 +69,30 @@ class StealthBrowser(Browser):
         self.context = None
         self.page = None
         self.config = config
+        self._rng = np.random.default_rng()
+        self._jitter_pool = deque()
+
+    @classmethod
+    def _driver_lock(cls) -> asyncio.Lock:
+        """Return the lock guarding the shared driver of the running event loop"""
+        loop = asyncio.get_running_loop()
+        lock = cls._shared_playwright_locks.get(loop)
+        if lock is None:
+            lock = cls._shared_playwright_locks[loop] = asyncio.Lock()
+        return lock
 
     async def _init(self):
         try:
-            self.playwright = await async_playwright().start()
+            loop = asyncio.get_running_loop()
+            async with StealthBrowser._driver_lock():
+                if loop not in StealthBrowser._shared_playwright:
+                    StealthBrowser._shared_playwright[loop] = await async_playwright().start()
+            self.playwright = StealthBrowser._shared_playwright[loop]
             
             # Launch browser with stealth configurations
             self.playwright_browser= await self.playwright.chromium.launch(
                 headless=self.config.headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-features=IsolateOrigins,site-per-process',
-                    '--disable-site-isolation-trials',
-                    '--disable-features=UserAgentClientHint',
-                    '--no-sandbox',
-                    '--disable-webgl',
-                    '--disable-threaded-scrolling',
-                    '--disable-threaded-animation',
-                    '--disable-extensions'
-                ]
+                args=list(_STEALTH_LAUNCH_ARGS)
             )
         except Exception as e:
             raise e 
@@ -75,23 +123,7 @@ class StealthBrowser(Browser):
             )
 
             # Add script to modify navigator properties
-            await self.context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['en-US', 'en']
-                });
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [
-                        {
-                            name: 'Chrome PDF Plugin',
-                            description: 'Portable Document Format',
-                            filename: 'internal-pdf-viewer'
-                        }
-                    ]
-                });
-            """)
+            await self.context.add_init_script(_STEALTH_INIT_SCRIPT)
 
             return self.context
 
@@ -100,41 +132,58 @@ class StealthBrowser(Browser):
             await self.cleanup()
             raise
 
+    def _jitter(self) -> float:
+        """Return a uniform [0, 1) sample, refilling the pool in one vectorized draw"""
+        if not self._jitter_pool:
+            self._jitter_pool.extend(self._rng.random(256).tolist())
+        return self._jitter_pool.popleft()
+
     async def random_delay(self, min_seconds: float = 1, max_seconds: float = 3):
         """Add random delay to mimic human behavior"""
-        delay = random.uniform(min_seconds, max_seconds)
+        delay = min_seconds + (max_seconds - min_seconds) * self._jitter()
         await asyncio.sleep(delay)
         return delay
 
     async def human_like_typing(self, element, text: str):
         """Type text with random delays between keystrokes"""
-        for char in text:
-            await element.type(char, delay=random.randint(50, 150))
-            await self.random_delay(0.1, 0.3)
+        # Playwright applies the per-key delay in the driver, so one call covers the whole string
+        await element.type(text, delay=50 + int(101 * self._jitter()))
 
     async def login_to_gmail(self, email: str, password: str):
         """Perform Gmail login with stealth measures"""
         try:
             self.page = await self.context.new_page()
             
-            # Navigate to Gmail
+            # Navigate to Gmail; the email field appears long before network idle,
+            # so wait for it alongside navigation instead of after it
             logger.info("Navigating to Gmail...")
-            await self.page.goto('https://gmail.com', wait_until='networkidle')
-            await self.random_delay()
+            navigation = asyncio.create_task(self.page.goto('https://gmail.com', wait_until='domcontentloaded'))
+            try:
+                email_input, _ = await asyncio.gather(
+                    self.page.wait_for_selector('input[type="email"]'),
+                    self.random_delay(),
+                )
+            except BaseException:
+                # Never leave the navigation task unawaited if the wait fails
+                navigation.cancel()
+                await asyncio.gather(navigation, return_exceptions=True)
+                raise
+            await navigation
 
             # Handle email input
             logger.info("Entering email...")
-            email_input = await self.page.wait_for_selector('input[type="email"]')
             await self.human_like_typing(email_input, email)
             await self.random_delay()
             
             # Click next after email
             await self.page.click('#identifierNext')
-            await self.random_delay(2, 4)
 
-            # Handle password input
+            # Handle password input, overlapping the human pause with the wait
             logger.info("Entering password...")
-            password_input = await self.page.wait_for_selector('input[type="password"]', timeout=5000)
+            password_input, _ = await asyncio.gather(
+                self.page.wait_for_selector('input[type="password"]', timeout=9000),
+                self.random_delay(2, 4),
+            )
             await self.human_like_typing(password_input, password)
             await self.random_delay()
 
@@ -153,16 +202,51 @@ class StealthBrowser(Browser):
             logger.error(f"Error during login: {str(e)}")
             raise
 
+    async def _close_page(self):
+        page, self.page = self.page, None
+        await page.close()
+
+    async def _close_context(self):
+        context, self.context = self.context, None
+        await context.close()
+
+    async def _close_browser(self):
+        browser, self.playwright_browser = self.playwright_browser, None
+        await browser.close()
+
     async def cleanup(self):
-        """Clean up browser resources"""
+        """Clean up browser resources, closing page, context and browser concurrently"""
+        closers = []
         if self.page:
-            await self.page.close()
+            closers.append(self._close_page())
         if self.context:
-            await self.context.close()
+            closers.append(self._close_context())
         if self.playwright_browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+            closers.append(self._close_browser())
+
+        results = await asyncio.gather(*closers, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Error during cleanup: {str(result)}")
+
+    async def close(self):
+        """Close this instance's browser, leaving the shared Playwright driver to shutdown()"""
+        try:
+            if self.playwright_browser:
+                await self.playwright_browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser: {str(e)}")
+        finally:
+            self.playwright_browser = None
+            self.playwright = None
+
+    @classmethod
+    async def shutdown(cls):
+        """Stop the Playwright driver shared by StealthBrowser instances on the running loop"""
+        async with cls._driver_lock():
+            playwright = cls._shared_playwright.pop(asyncio.get_running_loop(), None)
+            if playwright is not None:
+                await playwright.stop()
 
 async def main():
     gmail_browser = GmailStealthBrowser()
@@ -185,6 +269,7 @@ async def main():
         logger.error(f"Main execution error: {str(e)}")
     finally:
         await gmail_browser.cleanup()
+        await StealthBrowser.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -3,9 +3,9 @@ from browser_use.browser.context import BrowserContext, BrowserContextConfig, Br
 from playwright.async_api import Browser as PlaywrightBrowser
 import os 
 import asyncio
-import json
+import orjson
 import logging
-import random
+import numpy as np
 from browser_use.dom.service import DomService
 from browser_use.dom.views import DOMElementNode, SelectorMap
 from browser_use.browser.views import (
@@ -17,9 +17,408 @@ from browser_use.browser.views import (
 from browser_use.utils import time_execution_async, time_execution_sync
 from typing_extensions import Optional
 
-logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+# Used when the context config does not pin a user agent; matches the Chrome 120 client hints below
+_DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Anti-detection overrides, injected into every page of the context
+_STEALTH_INIT_JS = r"""
+// Comprehensive anti-detection script
+
+// Scalar navigator properties, defined once in a single call
+Object.defineProperties(navigator, {
+    webdriver: { get: () => undefined },
+    languages: { get: () => ['en-US', 'en'] },
+    hardwareConcurrency: { get: () => 8 },
+    deviceMemory: { get: () => 8 }
+});
+
+// Chrome runtime presence
+window.chrome = {
+    runtime: {
+        connect: () => {},
+        sendMessage: () => {},
+        onMessage: {
+            addListener: () => {},
+            removeListener: () => {}
+        },
+        onInstalled: { 
+            addListener: () => {} 
+        },
+        getPlatformInfo: () => {},
+        getManifest: () => ({version: '120.0.0.0'})
+    },
+    loadTimes: () => {},
+    csi: () => {},
+    app: {
+        getDetails: () => {},
+        getIsInstalled: () => {}
+    }
+};
+
+// Prevent detection via error stack traces
+const originalGetStackTrace = Error.prototype.stack;
+const _STACK_RE = /(\n.*at\s)(.*puppeteer.*|.*playwright.*)/g;
+Object.defineProperty(Error.prototype, 'stack', {
+    get() {
+        const stack = originalGetStackTrace && originalGetStackTrace.call(this);
+        if (!stack) return stack;
+        // Most stacks mention neither driver; skip the regex for those
+        if (stack.indexOf('puppeteer') === -1 && stack.indexOf('playwright') === -1) return stack;
+        return stack.replace(_STACK_RE, '$1');
+    }
+});
+
+// Plugins
+Object.defineProperty(navigator, 'plugins', {
+    get: () => {
+        const plugins = [
+            {
+                0: {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format"},
+                name: "Chrome PDF Plugin",
+                description: "Portable Document Format",
+                filename: "internal-pdf-viewer",
+                length: 1
+            },
+            {
+                0: {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format"},
+                name: "Chrome PDF Viewer",
+                description: "Portable Document Format",
+                filename: "mhjfbmdgcfjbbpaeojofohoefgiehjai",
+                length: 1
+            },
+            {
+                0: {type: "application/x-google-chrome-pdf", suffixes: "pdf", description: "Portable Document Format"},
+                name: "PDF Viewer",
+                description: "Portable Document Format",
+                filename: "internal-pdf-viewer",
+                length: 1
+            }
+        ];
+
+        // Make plugins appear as a real Array + PluginArray
+        const pluginArray = Object.create(Object.getPrototypeOf(navigator.plugins));
+        plugins.forEach((plugin, i) => {
+            pluginArray[i] = plugin;
+        });
+        pluginArray.length = plugins.length;
+
+        // Add required functions
+        pluginArray.item = function(index) { return this[index]; };
+        pluginArray.namedItem = function(name) {
+            for (const plugin of plugins) {
+                if (plugin.name === name) return plugin;
+            }
+            return null;
+        };
+
+        return pluginArray;
+    }
+});
+
+// Mimic a proper mimeTypes collection
+Object.defineProperty(navigator, 'mimeTypes', {
+    get: () => {
+        const mimeTypes = [
+            {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format", enabledPlugin: {name: "Chrome PDF Plugin"}},
+            {type: "text/pdf", suffixes: "pdf", description: "Portable Document Format", enabledPlugin: {name: "Chrome PDF Viewer"}}
+        ];
+
+        const mimeTypeArray = Object.create(Object.getPrototypeOf(navigator.mimeTypes));
+        mimeTypes.forEach((mimeType, i) => {
+            mimeTypeArray[i] = mimeType;
+        });
+        mimeTypeArray.length = mimeTypes.length;
+
+        mimeTypeArray.item = function(index) { return this[index]; };
+        mimeTypeArray.namedItem = function(name) {
+            for (const mime of mimeTypes) {
+                if (mime.type === name) return mime;
+            }
+            return null;
+        };
+
+        return mimeTypeArray;
+    }
+});
+
+// Override permissions API
+const originalQuery = window.navigator.permissions.query;
+window.navigator.permissions.query = (parameters) => {
+    if (parameters.name === 'notifications') {
+        return Promise.resolve({ state: Notification.permission });
+    }
+    if (parameters.name === 'clipboard-read' || parameters.name === 'clipboard-write') {
+        return Promise.resolve({ state: "prompt" });
+    }
+    return originalQuery(parameters);
+};
+
+// Fix shadow DOM detection
+(function() {
+    const originalAttachShadow = Element.prototype.attachShadow;
+    Element.prototype.attachShadow = function attachShadow(options) {
+        return originalAttachShadow.call(this, { ...options, mode: "open" });
+    };
+})();
+
+// Stop canvas fingerprinting
+const originalToDataURL = HTMLCanvasElement.prototype.toDataURL;
+HTMLCanvasElement.prototype.toDataURL = function(type) {
+    // Nothing to perturb on an empty canvas
+    if (this.width === 0 || this.height === 0) {
+        return originalToDataURL.apply(this, arguments);
+    }
+    // Is it in a test environment?
+    const context = this.getContext('2d');
+    if (context) {
+        const imageData = context.getImageData(0, 0, this.width, this.height);
+        const pixels = imageData.data;
+
+        // Draw all noise in native calls (getRandomValues caps each call at 64 KiB)
+        const noise = new Uint8Array(pixels.length);
+        for (let off = 0; off < noise.length; off += 65536) {
+            crypto.getRandomValues(noise.subarray(off, off + 65536));
+        }
+
+        // Slight random variations on the pixels
+        for (let i = 0; i < pixels.length; i += 4) {
+            // Only modify non-transparent pixels slightly (not noticeable to human)
+            if (pixels[i + 3] > 0) {
+                // Add tiny random variation [-1, 0, 1]; the clamped array bounds the result
+                pixels[i] += (noise[i] % 3) - 1;
+                pixels[i + 1] += (noise[i + 1] % 3) - 1;
+                pixels[i + 2] += (noise[i + 2] % 3) - 1;
+            }
+        }
+        context.putImageData(imageData, 0, 0);
+    }
+    return originalToDataURL.apply(this, arguments);
+};
+
+// Alter WebGL fingerprinting
+const getParameterProxied = WebGLRenderingContext.prototype.getParameter;
+WebGLRenderingContext.prototype.getParameter = function(parameter) {
+    // UNMASKED_VENDOR_WEBGL and UNMASKED_RENDERER_WEBGL
+    if (parameter === 37445) {
+        return 'Intel Inc.';
+    }
+    if (parameter === 37446) {
+        return 'Intel Iris OpenGL Engine';
+    }
+    return getParameterProxied.call(this, parameter);
+};
+
+// Fix iframe contentWindow access
+const originalContentWindow = Object.getOwnPropertyDescriptor(HTMLIFrameElement.prototype, 'contentWindow');
+Object.defineProperty(HTMLIFrameElement.prototype, 'contentWindow', {
+    get() {
+        const window = originalContentWindow.get.call(this);
+        if (!window) return null;
+
+        try {
+            // Test if cross-origin
+            window.self;
+            return window;
+        } catch (e) {
+            // Return a proxy for cross-origin iframes to avoid exceptions
+            return new Proxy({}, {
+                get: function() {
+                    return undefined;
+                }
+            });
+        }
+    }
+});
+
+// Override User Agent Client Hints API if available
+if (navigator.userAgentData) {
+    Object.defineProperty(navigator, 'userAgentData', {
+        get: () => ({
+            brands: [
+                {brand: "Google Chrome", version: "120"},
+                {brand: "Chromium", version: "120"},
+                {brand: "Not=A?Brand", version: "99"}
+            ],
+            mobile: false,
+            platform: "Windows",
+            getHighEntropyValues: () => Promise.resolve({
+                architecture: "x86",
+                bitness: "64",
+                brands: [
+                    {brand: "Google Chrome", version: "120"},
+                    {brand: "Chromium", version: "120"},
+                    {brand: "Not=A?Brand", version: "99"}
+                ],
+                fullVersionList: [
+                    {brand: "Google Chrome", version: "120.0.6099.109"},
+                    {brand: "Chromium", version: "120.0.6099.109"},
+                    {brand: "Not=A?Brand", version: "99.0.0.0"}
+                ],
+                mobile: false,
+                model: "",
+                platform: "Windows",
+                platformVersion: "10.0.0",
+                uaFullVersion: "120.0.6099.109"
+            })
+        })
+    });
+}
+
+// Override getBattery
+if (navigator.getBattery) {
+    navigator.getBattery = () => Promise.resolve({
+        charging: true,
+        chargingTime: 0,
+        dischargingTime: Infinity,
+        level: 1,
+        addEventListener: () => {},
+        removeEventListener: () => {}
+    });
+}
+
+// Override connection API
+if (navigator.connection) {
+    Object.defineProperties(navigator.connection, {
+        effectiveType: {
+            get: () => '4g'
+        },
+        rtt: {
+            get: () => 50
+        },
+        downlink: {
+            get: () => 10
+        },
+        saveData: {
+            get: () => false
+        }
+    });
+}
+"""
+
+# JS click used when Playwright's native click fails, passed straight to page.evaluate
+# so nothing is installed on the page
+_CLICK_FALLBACK_JS = r"""(el) => {
+    // Dispatch the pointer sequence synchronously so the click has fired by the time evaluate resolves
+    const rect = el.getBoundingClientRect();
+    const init = {
+        bubbles: true,
+        cancelable: true,
+        view: window,
+        clientX: rect.left + rect.width / 2,
+        clientY: rect.top + rect.height / 2,
+        button: 0
+    };
+    el.dispatchEvent(new MouseEvent('mouseover', init));
+    el.dispatchEvent(new MouseEvent('mousedown', init));
+    el.dispatchEvent(new MouseEvent('mouseup', init));
+    el.click();
+}"""
+
+# All scripts are registered through a single add_init_script call. The IIFE
+# keeps the scripts' top-level bindings out of the page's global scope.
+_COMBINED_INIT_JS = (
+    "(() => {\n"
+    + _STEALTH_INIT_JS +
+    "\n})();\n"
+)
+
+# Runs after Playwright's fill(): waits for a paint so framework handlers can react,
+# then reports whether the text stuck (some frameworks clear the field)
+_CHECK_FILLED_JS = r"""async (el, text) => {
+    await new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)));
+    return !text || el.value !== '';
+}"""
+
+# Element probes used by ExtendedContext._probe; each returns every flag its caller needs
+_INPUT_PROBE_JS = r"""(el) => ({
+    tag: el.tagName.toLowerCase(),
+    editable: !!el.isContentEditable,
+    readonly: !!el.readOnly,
+    disabled: !!el.disabled
+})"""
+
+# `download` classifies what a click may start: true for a likely file download, false
+# when one is ruled out, null when the probe cannot tell. Icons and spans inside a
+# link or submit button are classified by that enclosing element.
+_CLICK_PROBE_JS = r"""(el) => {
+    const link = el.closest('a[href]');
+    if (link) {
+        return {
+            download: link.hasAttribute('download')
+                || /\.(pdf|zip|csv|xlsx?|docx?|pptx?|png|jpe?g|txt|json|tar|gz|7z|rar)(?:[?#]|$)/i.test(link.href)
+        };
+    }
+    const control = el.closest('button, input[type="submit"], input[type="image"]');
+    if (control && (control.type === 'submit' || control.type === 'image')) {
+        const form = control.form || el.closest('form');
+        if (form) {
+            return { download: form.enctype === 'multipart/form-data' ? true : null };
+        }
+    }
+    if (el.closest('input, select, textarea, option, label')) {
+        return { download: false };
+    }
+    return { download: null };
+}"""
+
+_RNG = np.random.default_rng()
+
+# Text areas and rich editors receive longer text via fill() instead of typing
+_FAST_FILL_MIN_LENGTH = 40
+
+_VALID_SAME_SITE = frozenset(('Strict', 'Lax', 'None'))
+
+# Parsed and sameSite-fixed cookie lists by path, with the (path, mtime, size) they were
+# read at; a rewritten file replaces its entry, so there is one entry per path
+_COOKIES_CACHE: dict[str, tuple[tuple[str, float, int], list]] = {}
+
+
+def _cookies_signature(path: str) -> tuple[str, float, int]:
+    """Identify a cookies file by path, modification time and size."""
+    st = os.stat(path)
+    return (path, st.st_mtime, st.st_size)
+
+
+def _load_cookies(path: str) -> Optional[list]:
+    """
+    Load cookies from a JSON file, fixing invalid sameSite values.
+
+    Results are cached per file identity so repeated contexts created from an
+    unchanged cookies file skip the reparse.
+
+    Args:
+        path: Path to the cookies file.
+
+    Returns:
+        The cookie list, or None if the file could not be parsed.
+    """
+    signature = _cookies_signature(path)
+    cached = _COOKIES_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(path, 'rb') as f:
+        try:
+            cookies = orjson.loads(f.read())
+        except orjson.JSONDecodeError as e:
+            logger.error(f'Failed to parse cookies file: {str(e)}')
+            return None
+
+    for cookie in cookies:
+        same_site = cookie.get('sameSite', 'None')
+        if same_site not in _VALID_SAME_SITE:
+            logger.warning(
+                f"Fixed invalid sameSite value '{same_site}' to 'None' for cookie {cookie.get('name')}"
+            )
+            cookie['sameSite'] = 'None'
+    logger.info(f'🍪  Loaded {len(cookies)} cookies from {path}')
+
+    _COOKIES_CACHE[path] = (signature, cookies)
+    return cookies
+
+
 class ExtendedContext(BrowserContext):
     
     def __init__(self, browser: Browser, 
@@ -41,7 +440,7 @@ class ExtendedContext(BrowserContext):
             # Enhanced stealth configurations
             context = await browser.new_context(
                 no_viewport=True,
-                user_agent=self.config.user_agent or 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                user_agent=self.config.user_agent or _DEFAULT_USER_AGENT,
                 java_script_enabled=True,
                 bypass_csp=self.config.disable_security,
                 ignore_https_errors=self.config.disable_security,
@@ -56,407 +455,43 @@ class ExtendedContext(BrowserContext):
                 forced_colors='none',
             )
 
+        # Tracing, cookies and init scripts are independent, so issue them concurrently
+        setup = []
         if self.config.trace_path:
-            await context.tracing.start(screenshots=True, snapshots=True, sources=True)
+            setup.append(context.tracing.start(screenshots=True, snapshots=True, sources=True))
 
-        # Load cookies if they exist
+        # Load cookies if they exist, unless this context already has this exact file applied
+        applied_cookies_sig = None
         if self.config.cookies_file and os.path.exists(self.config.cookies_file):
-            with open(self.config.cookies_file, 'r') as f:
-                try:
-                    cookies = json.load(f)
-
-                    valid_same_site_values = ['Strict', 'Lax', 'None']
-                    for cookie in cookies:
-                        if 'sameSite' in cookie:
-                            if cookie['sameSite'] not in valid_same_site_values:
-                                logger.warning(
-                                    f"Fixed invalid sameSite value '{cookie['sameSite']}' to 'None' for cookie {cookie.get('name')}"
-                                )
-                                cookie['sameSite'] = 'None'
-                    logger.info(f'🍪  Loaded {len(cookies)} cookies from {self.config.cookies_file}')
-                    await context.add_cookies(cookies)
-
-                except json.JSONDecodeError as e:
-                    logger.error(f'Failed to parse cookies file: {str(e)}')
-
-        # Modified anti-detection script with safer DOM manipulation
-        await context.add_init_script(
-            r"""
-            // Comprehensive anti-detection script
-            
-            // Basic webdriver property
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            
-            // Chrome runtime presence
-            window.chrome = {
-                runtime: {
-                    connect: () => {},
-                    sendMessage: () => {},
-                    onMessage: {
-                        addListener: () => {},
-                        removeListener: () => {}
-                    },
-                    onInstalled: { 
-                        addListener: () => {} 
-                    },
-                    getPlatformInfo: () => {},
-                    getManifest: () => ({version: '120.0.0.0'})
-                },
-                loadTimes: () => {},
-                csi: () => {},
-                app: {
-                    getDetails: () => {},
-                    getIsInstalled: () => {}
-                }
-            };
-            
-            // Prevent detection via error stack traces
-            const originalGetStackTrace = Error.prototype.stack;
-            Object.defineProperty(Error.prototype, 'stack', {
-                get() {
-                    return originalGetStackTrace && originalGetStackTrace
-                        .call(this)
-                        .replace(/(\n.*at\s)(.*puppeteer.*|.*playwright.*)/g, '$1');
-                }
-            });
-            
-            // Language and plugins
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-US', 'en']
-            });
-            
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => {
-                    const plugins = [
-                        {
-                            0: {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format"},
-                            name: "Chrome PDF Plugin",
-                            description: "Portable Document Format",
-                            filename: "internal-pdf-viewer",
-                            length: 1
-                        },
-                        {
-                            0: {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format"},
-                            name: "Chrome PDF Viewer",
-                            description: "Portable Document Format",
-                            filename: "mhjfbmdgcfjbbpaeojofohoefgiehjai",
-                            length: 1
-                        },
-                        {
-                            0: {type: "application/x-google-chrome-pdf", suffixes: "pdf", description: "Portable Document Format"},
-                            name: "PDF Viewer",
-                            description: "Portable Document Format",
-                            filename: "internal-pdf-viewer",
-                            length: 1
-                        }
-                    ];
-                    
-                    // Make plugins appear as a real Array + PluginArray
-                    const pluginArray = Object.create(Object.getPrototypeOf(navigator.plugins));
-                    plugins.forEach((plugin, i) => {
-                        pluginArray[i] = plugin;
-                    });
-                    pluginArray.length = plugins.length;
-                    
-                    // Add required functions
-                    pluginArray.item = function(index) { return this[index]; };
-                    pluginArray.namedItem = function(name) {
-                        for (const plugin of plugins) {
-                            if (plugin.name === name) return plugin;
-                        }
-                        return null;
-                    };
-                    
-                    return pluginArray;
-                }
-            });
-            
-            // Mimic a proper mimeTypes collection
-            Object.defineProperty(navigator, 'mimeTypes', {
-                get: () => {
-                    const mimeTypes = [
-                        {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format", enabledPlugin: {name: "Chrome PDF Plugin"}},
-                        {type: "text/pdf", suffixes: "pdf", description: "Portable Document Format", enabledPlugin: {name: "Chrome PDF Viewer"}}
-                    ];
-                    
-                    const mimeTypeArray = Object.create(Object.getPrototypeOf(navigator.mimeTypes));
-                    mimeTypes.forEach((mimeType, i) => {
-                        mimeTypeArray[i] = mimeType;
-                    });
-                    mimeTypeArray.length = mimeTypes.length;
-                    
-                    mimeTypeArray.item = function(index) { return this[index]; };
-                    mimeTypeArray.namedItem = function(name) {
-                        for (const mime of mimeTypes) {
-                            if (mime.type === name) return mime;
-                        }
-                        return null;
-                    };
-                    
-                    return mimeTypeArray;
-                }
-            });
-            
-            // Override permissions API
-            const originalQuery = window.navigator.permissions.query;
-            window.navigator.permissions.query = (parameters) => {
-                if (parameters.name === 'notifications') {
-                    return Promise.resolve({ state: Notification.permission });
-                }
-                if (parameters.name === 'clipboard-read' || parameters.name === 'clipboard-write') {
-                    return Promise.resolve({ state: "prompt" });
-                }
-                return originalQuery(parameters);
-            };
-            
-            // Fix shadow DOM detection
-            (function() {
-                const originalAttachShadow = Element.prototype.attachShadow;
-                Element.prototype.attachShadow = function attachShadow(options) {
-                    return originalAttachShadow.call(this, { ...options, mode: "open" });
-                };
-            })();
-            
-            // Stop canvas fingerprinting
-            const originalToDataURL = HTMLCanvasElement.prototype.toDataURL;
-            HTMLCanvasElement.prototype.toDataURL = function(type) {
-                // Is it in a test environment?
-                const context = this.getContext('2d');
-                if (context) {
-                    const imageData = context.getImageData(0, 0, this.width, this.height);
-                    const pixels = imageData.data;
-                    
-                    // Slight random variations on the pixels
-                    for (let i = 0; i < pixels.length; i += 4) {
-                        // Only modify non-transparent pixels slightly (not noticeable to human)
-                        if (pixels[i + 3] > 0) {
-                            for (let j = 0; j < 3; j++) {
-                                const val = pixels[i + j];
-                                // Add tiny random variation [-1, 0, 1]
-                                pixels[i + j] = Math.max(0, Math.min(255, val + (Math.floor(Math.random() * 3) - 1)));
-                            }
-                        }
-                    }
-                    context.putImageData(imageData, 0, 0);
-                }
-                return originalToDataURL.apply(this, arguments);
-            };
-            
-            // Alter WebGL fingerprinting
-            const getParameterProxied = WebGLRenderingContext.prototype.getParameter;
-            WebGLRenderingContext.prototype.getParameter = function(parameter) {
-                // UNMASKED_VENDOR_WEBGL and UNMASKED_RENDERER_WEBGL
-                if (parameter === 37445) {
-                    return 'Intel Inc.';
-                }
-                if (parameter === 37446) {
-                    return 'Intel Iris OpenGL Engine';
-                }
-                return getParameterProxied.call(this, parameter);
-            };
-            
-            // Fix iframe contentWindow access
-            const originalContentWindow = Object.getOwnPropertyDescriptor(HTMLIFrameElement.prototype, 'contentWindow');
-            Object.defineProperty(HTMLIFrameElement.prototype, 'contentWindow', {
-                get() {
-                    const window = originalContentWindow.get.call(this);
-                    if (!window) return null;
-                    
-                    try {
-                        // Test if cross-origin
-                        window.self;
-                        return window;
-                    } catch (e) {
-                        // Return a proxy for cross-origin iframes to avoid exceptions
-                        return new Proxy({}, {
-                            get: function() {
-                                return undefined;
-                            }
-                        });
-                    }
-                }
-            });
-            
-            // Override User Agent Client Hints API if available
-            if (navigator.userAgentData) {
-                Object.defineProperty(navigator, 'userAgentData', {
-                    get: () => ({
-                        brands: [
-                            {brand: "Google Chrome", version: "120"},
-                            {brand: "Chromium", version: "120"},
-                            {brand: "Not=A?Brand", version: "99"}
-                        ],
-                        mobile: false,
-                        platform: "Windows",
-                        getHighEntropyValues: () => Promise.resolve({
-                            architecture: "x86",
-                            bitness: "64",
-                            brands: [
-                                {brand: "Google Chrome", version: "120"},
-                                {brand: "Chromium", version: "120"},
-                                {brand: "Not=A?Brand", version: "99"}
-                            ],
-                            fullVersionList: [
-                                {brand: "Google Chrome", version: "120.0.6099.109"},
-                                {brand: "Chromium", version: "120.0.6099.109"},
-                                {brand: "Not=A?Brand", version: "99.0.0.0"}
-                            ],
-                            mobile: false,
-                            model: "",
-                            platform: "Windows",
-                            platformVersion: "10.0.0",
-                            uaFullVersion: "120.0.6099.109"
-                        })
-                    })
-                });
-            }
-            
-            // Override getBattery
-            if (navigator.getBattery) {
-                navigator.getBattery = () => Promise.resolve({
-                    charging: true,
-                    chargingTime: 0,
-                    dischargingTime: Infinity,
-                    level: 1,
-                    addEventListener: () => {},
-                    removeEventListener: () => {}
-                });
-            }
-            
-            // Override connection API
-            if (navigator.connection) {
-                Object.defineProperties(navigator.connection, {
-                    effectiveType: {
-                        get: () => '4g'
-                    },
-                    rtt: {
-                        get: () => 50
-                    },
-                    downlink: {
-                        get: () => 10
-                    },
-                    saveData: {
-                        get: () => false
-                    }
-                });
-            }
-            
-            // Override hardwareConcurrency and deviceMemory
-            Object.defineProperty(navigator, 'hardwareConcurrency', { get: () => 8 });
-            Object.defineProperty(navigator, 'deviceMemory', { get: () => 8 });
-            
-            // Modified: Only apply subtle DOM position changes that won't affect functionality
-            // Completely disable position modifications for interactive elements
-            const originalGetBoundingClientRect = Element.prototype.getBoundingClientRect;
-            Element.prototype.getBoundingClientRect = function() {
-                const rect = originalGetBoundingClientRect.apply(this, arguments);
-                
-                // Check if this is an interactive element that needs precise positioning
-                const tagName = this.tagName ? this.tagName.toLowerCase() : '';
-                const isInteractive = ['input', 'textarea', 'select', 'button', 'a'].includes(tagName) || 
-                                      this.getAttribute('role') === 'button' ||
-                                      this.getAttribute('contenteditable') === 'true';
-                
-                // Don't modify positions for interactive elements
-                if (!isInteractive) {
-                    // Use an extremely small offset that won't affect functionality
-                    const offset = 0.00000001; // Virtually unnoticeable
-                    rect.x += offset;
-                    rect.y += offset;
-                    rect.width += offset;
-                    rect.height += offset;
-                    rect.top += offset;
-                    rect.right += offset;
-                    rect.bottom += offset;
-                    rect.left += offset;
-                }
-                
-                return rect;
-            };
-            """
-        )
-
-        # Modified human-like interactions script with safer event handling
-        await context.add_init_script(
-            r"""
-            // Modified human-like interaction patterns with minimal DOM interference
-            (function() {
-                const originalAddEventListener = EventTarget.prototype.addEventListener;
-                EventTarget.prototype.addEventListener = function(type, listener, options) {
-                    // Only modify non-critical events on non-interactive elements
-                    if (type === 'mousemove' || type === 'touchmove') {
-                        // Determine if this is an interactive element that needs precise events
-                        const isInteractive = (this instanceof HTMLInputElement || 
-                                              this instanceof HTMLTextAreaElement || 
-                                              this instanceof HTMLSelectElement ||
-                                              this instanceof HTMLButtonElement ||
-                                              this instanceof HTMLAnchorElement ||
-                                              (this instanceof HTMLElement && 
-                                                (this.getAttribute('role') === 'button' ||
-                                                 this.getAttribute('contenteditable') === 'true')));
-                                                 
-                        // Only wrap listener if it's not an interactive element
-                        if (!isInteractive) {
-                            const wrappedListener = function(event) {
-                                // Don't modify events created by real users
-                                if (!event.isTrusted) {
-                                    if (event.clientX !== undefined) {
-                                        // Use extremely minimal randomness that won't affect functionality
-                                        const randomFactor = (Math.random() * 0.005) - 0.0025; // Tiny range
-                                        
-                                        // Only modify if property doesn't already have getter/setter
-                                        if (!Object.getOwnPropertyDescriptor(event, '_clientX')) {
-                                            try {
-                                                Object.defineProperty(event, '_clientX', {
-                                                    value: event.clientX + randomFactor,
-                                                    writable: true
-                                                });
-                                                
-                                                Object.defineProperty(event, 'clientX', {
-                                                    get: function() { return this._clientX; }
-                                                });
-                                            } catch (e) {
-                                                // Silently fail if we can't modify the event
-                                                // This prevents breaking UI frameworks
-                                            }
-                                        }
-                                        
-                                        if (!Object.getOwnPropertyDescriptor(event, '_clientY')) {
-                                            try {
-                                                Object.defineProperty(event, '_clientY', {
-                                                    value: event.clientY + randomFactor,
-                                                    writable: true
-                                                });
-                                                
-                                                Object.defineProperty(event, 'clientY', {
-                                                    get: function() { return this._clientY; }
-                                                });
-                                            } catch (e) {
-                                                // Silently fail
-                                            }
-                                        }
-                                    }
-                                }
-                                
-                                // Call the original listener
-                                return listener.apply(this, arguments);
-                            };
-                            
-                            return originalAddEventListener.call(this, type, wrappedListener, options);
-                        }
-                    }
-                    
-                    // For all other cases, use the original event listener
-                    return originalAddEventListener.call(this, type, listener, options);
-                };
-            })();
-            """
-        )
+            cookies_sig = _cookies_signature(self.config.cookies_file)
+            if getattr(context, '_autoagent_cookies_sig', None) != cookies_sig:
+                cookies = _load_cookies(self.config.cookies_file)
+                if cookies is not None:
+                    setup.append(context.add_cookies(cookies))
+                    applied_cookies_sig = cookies_sig
+
+        # Anti-detection scripts in one round-trip
+        setup.append(context.add_init_script(_COMBINED_INIT_JS))
+
+        await asyncio.gather(*setup)
+        if applied_cookies_sig is not None:
+            context._autoagent_cookies_sig = applied_cookies_sig
 
         return context
-    
+
+    async def _probe(self, element_handle, script: str) -> dict:
+        """
+        Read a set of element properties in a single round-trip.
+
+        Args:
+            element_handle: The playwright element handle to inspect
+            script: A probe script taking the element and returning a flat object
+
+        Returns:
+            dict: The properties reported by the script
+        """
+        return await element_handle.evaluate(script)
+
     @time_execution_async('--input_text_element_node')
     async def _input_text_element_node(self, element_node: DOMElementNode, text: str):
         """
@@ -476,60 +511,48 @@ class ExtendedContext(BrowserContext):
                 if not is_hidden:
                     await element_handle.scroll_into_view_if_needed(timeout=1000)
             except Exception as e:
-                logger.debug(f"Non-critical error preparing element: {str(e)}")
+                logger.debug("Non-critical error preparing element: %s", e)
                 pass
 
-            # Get element properties to determine input method
-            tag_handle = await element_handle.get_property('tagName')
-            tag_name = (await tag_handle.json_value()).lower()
-            is_contenteditable = await element_handle.get_property('isContentEditable')
-            readonly_handle = await element_handle.get_property('readOnly')
-            disabled_handle = await element_handle.get_property('disabled')
-
-            readonly = await readonly_handle.json_value() if readonly_handle else False
-            disabled = await disabled_handle.json_value() if disabled_handle else False
+            # Get element properties to determine input method in a single round-trip
+            props = await self._probe(element_handle, _INPUT_PROBE_JS)
+            tag_name = props['tag']
+            editable = props['editable']
+            readonly = props['readonly']
+            disabled = props['disabled']
 
             # Modified approach that works better with various UI frameworks
-            if ((await is_contenteditable.json_value()) or tag_name == 'input') and not (readonly or disabled):
-                # First focus on the element
-                await element_handle.focus()
-                await asyncio.sleep(0.2)
-                
-                # Common approach to clear the field
+            if (editable or tag_name == 'input') and not (readonly or disabled):
+                # Focus and clear the field in one round-trip, notifying listeners of the change
                 await element_handle.evaluate('''(el) => {
+                    el.focus();
                     // Clear the field using the most compatible approach
-                    if (el.tagName.toLowerCase() === 'input' || el.tagName.toLowerCase() === 'textarea') {
+                    if (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA') {
                         el.value = '';
                     } else if (el.isContentEditable) {
                         el.textContent = '';
                     }
+                    el.dispatchEvent(new Event('input', { bubbles: true }));
                 }''')
                 
-                await asyncio.sleep(0.2)
-                
-                # Determine best input method based on field type
-                # We use fill for some cases and typing for others for better compatibility
-                input_type = ""
-                if tag_name == "input":
-                    type_handle = await element_handle.get_property('type')
-                    input_type = await type_handle.json_value()
-                
                 # Use different typing strategies based on element type
                 # but avoid any specific site or field-type logic
-                if tag_name == 'textarea' or (await is_contenteditable.json_value()):
-                    # For text areas and rich text editors, use human-like typing
-                    await self.human_like_typing(element_handle, text)
+                if tag_name == 'textarea' or editable:
+                    if len(text) > _FAST_FILL_MIN_LENGTH:
+                        # Long bodies gain nothing from keystroke timing; set them in one call
+                        await element_handle.fill(text)
+                    else:
+                        # For text areas and rich text editors, use human-like typing
+                        await self.human_like_typing(element_handle, text)
                 else:
                     # For standard input fields, use a more reliable approach that
                     # works better with form validation and auto-completion
                     try: 
                         # Try fill first as it's more reliable for modern frameworks
                         await element_handle.fill(text)
-                        await asyncio.sleep(0.3)  # Let the UI update
-                        
-                        # Check if the text actually got entered (some frameworks clear it)
-                        value = await element_handle.evaluate('el => el.value')
-                        if not value and text:  # If field is empty but should have text
+                        # Let the UI update and check the text stuck in one round-trip
+                        filled = await element_handle.evaluate(_CHECK_FILLED_JS, text)
+                        if not filled:  # Field is empty but should have text (some frameworks clear it)
                             # Fall back to type method
                             await element_handle.evaluate('el => el.value = ""')  # Clear again
                             await self.human_like_typing(element_handle, text, reduced_randomness=True)
@@ -537,20 +560,17 @@ class ExtendedContext(BrowserContext):
                         # If fill fails, fall back to typing
                         await self.human_like_typing(element_handle, text, reduced_randomness=True)
                 
-                # Adding a small delay after input helps with reactivity
-                await asyncio.sleep(0.3)
-                
                 # Press Tab after entering text to trigger validation and move focus
                 # This helps with many UI frameworks' input handling
                 await element_handle.press('Tab')
             else:
                 # For other elements, use fill
-                await asyncio.sleep(0.1)
                 await element_handle.fill(text)
-                await asyncio.sleep(0.2)
                 
         except Exception as e:
-            logger.debug(f'❌  Failed to input text into element: {repr(element_node)}. Error: {str(e)}')
+            # repr(element_node) can be expensive, so only build it when debug is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('❌  Failed to input text into element: %r. Error: %s', element_node, e)
             raise BrowserError(f'Failed to input text into index {element_node.highlight_index}')
         
         
@@ -570,11 +590,19 @@ class ExtendedContext(BrowserContext):
 
             if element_handle is None:
                 raise Exception(f'Element: {repr(element_node)} not found')
+
+            # Skip the 5s download wait only when the probe rules a download out
+            may_download = False
+            if self.config.save_downloads_path:
+                try:
+                    may_download = (await self._probe(element_handle, _CLICK_PROBE_JS))['download'] is not False
+                except Exception:
+                    may_download = True
             
             async def perform_click(click_func):
                 """Performs the actual click, handling both download
 				and navigation scenarios."""
-                if self.config.save_downloads_path:
+                if may_download:
                     try:
 						# Try short-timeout expect_download to detect a file download has been been triggered
                         async with page.expect_download(timeout=5000) as download_info:
@@ -585,7 +613,7 @@ class ExtendedContext(BrowserContext):
                         unique_filename = await self._get_unique_filename(self.config.save_downloads_path, suggested_filename)
                         download_path = os.path.join(self.config.save_downloads_path, unique_filename)
                         await download.save_as(download_path)
-                        logger.debug(f'Download triggered. Saved file to: {download_path}')
+                        logger.debug('Download triggered. Saved file to: %s', download_path)
                         return download_path
                     except TimeoutError:
 						# If no download is triggered, treat as normal click
@@ -604,7 +632,7 @@ class ExtendedContext(BrowserContext):
                 raise e
             except Exception:
                 try:
-                    return await perform_click(lambda: page.evaluate('(el) => el.click()', element_handle))
+                    return await perform_click(lambda: page.evaluate(_CLICK_FALLBACK_JS, element_handle))
                 except URLNotAllowedError as e: 
                     raise e
                 except Exception as e:
@@ -734,26 +762,29 @@ class ExtendedContext(BrowserContext):
             min_delay = max(min_delay, 30)  # Ensure minimum delay is reasonable
             max_delay = min(min_delay + 50, max_delay)  # Reduce variance
         
-        # Type each character with random delay
-        for char in text:
-            # Calculate delay for this character
-            delay = random.randint(min_delay, max_delay)
-            
-            # Type the character with the calculated delay
-            try:
-                await element_handle.type(char, delay=delay)
-            except Exception:
-                # If typing fails, try inserting the text directly
-                try:
-                    await element_handle.evaluate(f'el => {{el.value += "{char}";}}')
-                except Exception:
-                    # If all fails, continue to next character
-                    pass
-            
-            # Add random longer pauses occasionally to simulate human thinking
-            # Less frequent and shorter if reduced_randomness is True
-            pause_chance = 0.05 if reduced_randomness else 0.1
-            pause_max = 0.3 if reduced_randomness else 0.5
-            
-            if random.random() < pause_chance:
-                await asyncio.sleep(random.uniform(0.1, pause_max))
\ No newline at end of file
+        # Playwright applies the per-key delay in the driver, so each chunk is one round-trip
+        avg_delay = (min_delay + max_delay) // 2
+        
+        # Add random longer pauses occasionally to simulate human thinking
+        # Less frequent and shorter if reduced_randomness is True
+        pause_chance = 0.05 if reduced_randomness else 0.1
+        pause_max = 0.3 if reduced_randomness else 0.5
+        
+        # Pick pause positions up front (at most a few) and type the text between them
+        # All randomness is drawn in batched NumPy calls rather than per keystroke
+        # (binomial count capped at three, then uniform placement; the cap means this
+        # only matches independent per-character coin flips when at most three land)
+        gaps = max(len(text) - 1, 0)
+        n_pauses = min(int(_RNG.binomial(gaps, pause_chance)), 3)
+        breaks = sorted((_RNG.choice(gaps, size=n_pauses, replace=False) + 1).tolist())
+        pauses = _RNG.uniform(0.1, pause_max, size=len(breaks)).tolist()
+        bounds = [0, *breaks, len(text)]
+        
+        try:
+            for i in range(len(bounds) - 1):
+                if i:
+                    await asyncio.sleep(pauses[i - 1])
+                await element_handle.type(text[bounds[i]:bounds[i + 1]], delay=avg_delay)
+        except Exception:
+            # If typing fails, set the whole value directly
+            await element_handle.fill(text)
\ No newline at end of file
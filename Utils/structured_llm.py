@@ -1,11 +1,14 @@
-from typing import Type, Dict, Any, Optional, Union, Tuple
+from typing import Type, Dict, Any, List, Optional, Union, Tuple
 from pydantic import BaseModel, ValidationError
-from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from langchain.chat_models.base import BaseChatModel
 import asyncio
 import logging
-from datetime import datetime
+import random
+import string
+import time
+import hashlib
+from collections import OrderedDict
 from functools import lru_cache
 import json
 from enum import Enum
@@ -18,8 +21,30 @@ class LLMResponseStatus(Enum):
     """Enum for tracking LLM response status"""
     SUCCESS = "success"
     RETRY = "retry"
+    RATE_LIMITED = "rate_limited"
     FAILURE = "failure"
 
+# Exception class names providers use for throttling and transient outages
+_TRANSIENT_ERROR_NAMES = frozenset((
+    "RateLimitError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "APIConnectionError",
+    "APITimeoutError",
+))
+
+def _is_transient_error(error: Exception) -> bool:
+    """Return True for rate limits and network errors that are worth retrying after a backoff."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in _TRANSIENT_ERROR_NAMES:
+        return True
+    return getattr(error, "status_code", None) in (429, 503)
+
+# In-flight calls allowed per LLM unless max_concurrency_per_model says otherwise
+_DEFAULT_MODEL_CONCURRENCY = 32
+
+
 class LLMException(Exception):
     """Base exception class for LLM-related errors"""
     pass
@@ -36,6 +61,62 @@ class PromptFormattingError(LLMException):
     """Raised when there's an issue with prompt formatting"""
     pass
 
+
+# Output structures are module-level classes that live for the whole process (and
+# _get_template's lru_cache holds them anyway), so a plain dict is enough here
+_schema_cache: Dict[Type[BaseModel], str] = {}
+
+
+def _format_instructions_for(model_cls: Type[BaseModel]) -> str:
+    """
+    Get the parser format instructions for a model class, generating its JSON schema only once.
+
+    Args:
+        model_cls: Pydantic model class for output structure
+
+    Returns:
+        Format instructions string
+    """
+    instructions = _schema_cache.get(model_cls)
+    if instructions is None:
+        instructions = PydanticOutputParser(pydantic_object=model_cls).get_format_instructions()
+        _schema_cache[model_cls] = instructions
+    return instructions
+
+
+@lru_cache(maxsize=256)
+def _get_template(prompt_template: str, output_structure: Type[BaseModel]) -> str:
+    """
+    Get or create a cached template string with the format instructions already substituted.
+
+    The template is parsed and validated once here; the result is ready for
+    ``str.format_map`` with the remaining prompt variables.
+
+    Args:
+        prompt_template: Template string with formatting placeholders
+        output_structure: Pydantic model for output structure
+
+    Returns:
+        Template string with ``{format_instructions}`` filled in
+    """
+    instructions = _format_instructions_for(output_structure).replace("{", "{{").replace("}", "}}")
+    parts = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(prompt_template):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field_name is None:
+            continue
+        if field_name == "format_instructions":
+            parts.append(instructions)
+            continue
+        placeholder = field_name
+        if conversion:
+            placeholder += f"!{conversion}"
+        if format_spec:
+            placeholder += f":{format_spec}"
+        parts.append(f"{{{placeholder}}}")
+    return "".join(parts)
+
+
 class StructuredLLMHandler:
     """
     A production-grade handler for structured LLM responses with fallback support.
@@ -43,8 +124,13 @@ class StructuredLLMHandler:
     Attributes:
         _llm_dict (Dict[str, BaseChatModel]): Dictionary containing main and fallback LLMs
         _cache_ttl (int): Time-to-live for cached responses in seconds
+        _cache_max_size (int): Maximum number of cached responses before LRU eviction
         _max_retries (int): Maximum number of retry attempts
-        _retry_delay (float): Delay between retries in seconds
+        _retry_delay (float): Base delay between retries in seconds
+        _max_retry_delay (float): Upper bound for the exponential retry delay in seconds
+        _batch_semaphore (Optional[asyncio.Semaphore]): Bounds in-flight requests from batch calls, created on first use
+        _model_semaphores (Dict[int, asyncio.Semaphore]): Per-LLM concurrency limits, created on first use
+        _structured_llm_cache (Dict[Tuple[int, type], Any]): Bound structured-output runnables per LLM and model
     """
 
     def __init__(
@@ -53,7 +139,11 @@ class StructuredLLMHandler:
         fallback_llm : str = None,
         cache_ttl: int = 3600,
         max_retries: int = 3,
-        retry_delay: float = 1.0
+        retry_delay: float = 1.0,
+        max_concurrency: int = 8,
+        max_retry_delay: float = 30.0,
+        max_concurrency_per_model: Union[Dict[str, int], int] = _DEFAULT_MODEL_CONCURRENCY,
+        cache_max_size: int = 1024
     ):
         """
         Initialize the StructuredLLMHandler.
@@ -62,7 +152,12 @@ class StructuredLLMHandler:
             llm_dict: Dictionary containing 'main_llm' and 'fall_back_llm'
             cache_ttl: Cache time-to-live in seconds (default: 1 hour)
             max_retries: Maximum number of retry attempts (default: 3)
-            retry_delay: Delay between retries in seconds (default: 1.0)
+            retry_delay: Base delay between retries in seconds (default: 1.0)
+            max_concurrency: Maximum concurrent requests per batch call (default: 8)
+            max_retry_delay: Upper bound for the exponential retry delay (default: 30.0)
+            max_concurrency_per_model: In-flight request limit per LLM, either one value for all
+                models or a mapping of llm_dict keys to limits; unlisted models get 32 (default: 32)
+            cache_max_size: Maximum number of cached responses, evicted LRU (default: 1024)
 
         Raises:
             LLMConfigurationError: If LLM configuration is invalid
@@ -73,7 +168,28 @@ class StructuredLLMHandler:
         self._cache_ttl = cache_ttl
         self._max_retries = max_retries
         self._retry_delay = retry_delay
-        self._response_cache = {}
+        self._max_retry_delay = max_retry_delay
+        self._cache_max_size = cache_max_size
+        self._response_cache: OrderedDict[str, Tuple[float, BaseModel]] = OrderedDict()
+        self._max_concurrency = max_concurrency
+        self._batch_semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._inflight_waiters: Dict[str, int] = {}
+        if isinstance(max_concurrency_per_model, int):
+            self._default_model_concurrency = max_concurrency_per_model
+            self._model_concurrency: Dict[int, int] = {}
+        else:
+            unknown = set(max_concurrency_per_model) - set(llm_dict)
+            if unknown:
+                raise LLMConfigurationError(
+                    f"max_concurrency_per_model names unknown models: {sorted(unknown)}"
+                )
+            self._default_model_concurrency = _DEFAULT_MODEL_CONCURRENCY
+            self._model_concurrency = {
+                id(llm_dict[name]): limit for name, limit in max_concurrency_per_model.items()
+            }
+        self._model_semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._structured_llm_cache: Dict[Tuple[int, type], Any] = {}
         
     @staticmethod
     def _set_llm(
@@ -129,19 +245,7 @@ class StructuredLLMHandler:
                     f"LLM of {key} must be an instance of BaseChatModel, Got : {type(llm_object)} Object."
                 )
 
-    def _get_parser(self, output_structure: Type[BaseModel]) -> PydanticOutputParser:
-        """
-        Get or create a cached parser for the output structure.
-
-        Args:
-            output_structure: Pydantic model class for output structure
-
-        Returns:
-            PydanticOutputParser instance
-        """
-        return PydanticOutputParser(pydantic_object=output_structure)
-
-    async def _format_prompt(
+    def _format_prompt(
         self,
         prompt_template: str,
         output_structure: Type[BaseModel],
@@ -162,16 +266,55 @@ class StructuredLLMHandler:
             PromptFormattingError: If prompt formatting fails
         """
         try:
-            parser = self._get_parser(output_structure)
-            template = PromptTemplate(
-                template=prompt_template,
-                partial_variables={"format_instructions": parser.get_format_instructions()}
-            )
-            return template.format(**kwargs)
+            return _get_template(prompt_template, output_structure).format_map(kwargs)
         except Exception as e:
             LOGGER.exception("Failed to format prompt")
             raise PromptFormattingError(f"Prompt formatting failed: {str(e)}") from e
 
+    def _batch_sem(self) -> asyncio.Semaphore:
+        """
+        Get the semaphore bounding batch requests, creating it on first use.
+
+        Returns:
+            Semaphore shared by all batch calls on this handler
+        """
+        if self._batch_semaphore is None:
+            self._batch_semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._batch_semaphore
+
+    def _sem_for(self, llm: BaseChatModel) -> asyncio.Semaphore:
+        """
+        Get the concurrency semaphore for an LLM, creating it on first use.
+
+        Args:
+            llm: LLM instance
+
+        Returns:
+            Semaphore bounding in-flight calls to that LLM
+        """
+        semaphore = self._model_semaphores.get(id(llm))
+        if semaphore is None:
+            limit = self._model_concurrency.get(id(llm), self._default_model_concurrency)
+            semaphore = self._model_semaphores[id(llm)] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _structured(self, llm: BaseChatModel, output_structure: Type[BaseModel]) -> Any:
+        """
+        Get the structured-output runnable for an LLM and output structure, binding it once.
+
+        Args:
+            llm: LLM instance
+            output_structure: Pydantic model for structured output
+
+        Returns:
+            Runnable returning instances of output_structure
+        """
+        key = (id(llm), output_structure)
+        structured_llm = self._structured_llm_cache.get(key)
+        if structured_llm is None:
+            structured_llm = self._structured_llm_cache[key] = llm.with_structured_output(output_structure)
+        return structured_llm
+
     async def _handle_llm_response(
         self,
         llm: BaseChatModel,
@@ -190,41 +333,63 @@ class StructuredLLMHandler:
             Tuple of (response status, structured response or None)
         """
         try:
-            structured_llm = llm.with_structured_output(output_structure)
-            response = await structured_llm.ainvoke(message)
+            structured_llm = self._structured(llm, output_structure)
+            async with self._sem_for(llm):
+                response = await structured_llm.ainvoke(message)
             
-            if not response:
-                LOGGER.warning("Empty response received from LLM")
-                return LLMResponseStatus.RETRY, None
-
-            # Validate response against the output structure
-            if not isinstance(response, output_structure):
-                LOGGER.error(f"Invalid response type: {type(response)}")
-                return LLMResponseStatus.RETRY, None
+            # with_structured_output already returns output_structure or raises
+            if response is not None:
+                return LLMResponseStatus.SUCCESS, response
 
-            return LLMResponseStatus.SUCCESS, response
+            LOGGER.warning("Empty response received from LLM")
+            return LLMResponseStatus.RETRY, None
 
         except ValidationError as e:
             LOGGER.error(f"Response validation error: {str(e)}")
             # return LLMResponseStatus.RETRY, None
             raise e 
         except Exception as e:
+            if _is_transient_error(e):
+                LOGGER.warning(f"Transient LLM error, backing off: {str(e)}")
+                return LLMResponseStatus.RATE_LIMITED, None
             LOGGER.error(f"LLM invocation error: {str(e)}", exc_info=True)
             raise e 
             # return LLMResponseStatus.RETRY, None
 
-    def _get_cache_key(self, prompt: str, output_structure: Type[BaseModel]) -> str:
+    def _get_cache_key(self, prompt: str, output_structure: Type[BaseModel], model_id: str) -> str:
         """
-        Generate a unique cache key for the prompt and output structure.
+        Generate a unique cache key for the prompt, output structure and model.
 
         Args:
             prompt: Formatted prompt
             output_structure: Output structure class
+            model_id: Key of the LLM that answers the prompt
 
         Returns:
             Cache key string
         """
-        return f"{hash(prompt)}:{output_structure.__name__}"
+        # Qualified name, since different modules define models with the same class name
+        structure_id = f"{output_structure.__module__}.{output_structure.__qualname__}"
+        return hashlib.sha256(f"{prompt}|{structure_id}|{model_id}".encode()).hexdigest()
+
+    def _cache_get(self, cache_key: str) -> Optional[BaseModel]:
+        """Return a fresh cached response, refreshing its LRU position, or None."""
+        cached_response = self._response_cache.get(cache_key)
+        if cached_response is None:
+            return None
+        expires_at, response = cached_response
+        if time.monotonic() >= expires_at:
+            del self._response_cache[cache_key]
+            return None
+        self._response_cache.move_to_end(cache_key)
+        return response
+
+    def _cache_put(self, cache_key: str, response: BaseModel) -> None:
+        """Store a response, evicting the least recently used entry when full."""
+        if cache_key not in self._response_cache and len(self._response_cache) >= self._cache_max_size:
+            self._response_cache.popitem(last=False)
+        self._response_cache[cache_key] = (time.monotonic() + self._cache_ttl, response)
+        self._response_cache.move_to_end(cache_key)
 
     async def get_structured_response(
         self,
@@ -255,18 +420,101 @@ class StructuredLLMHandler:
         retry_attempts = retry_attempts or self._max_retries
         
         # Format the prompt
-        formatted_prompt = await self._format_prompt(prompt, output_structure, **kwargs)
+        formatted_prompt = self._format_prompt(prompt, output_structure, **kwargs)
         main_model = self._llm_dict[use_model] if use_model else self._main_llm
-        # # Check cache if enabled
-        # if use_cache:
-        #     cache_key = self._get_cache_key(formatted_prompt, output_structure)
-        #     cached_response = self._response_cache.get(cache_key)
-        #     if cached_response:
-        #         cache_time, response = cached_response
-        #         if (datetime.now().timestamp() - cache_time) < self._cache_ttl:
-        #             LOGGER.info("Returning cached response")
-        #             return response
+        return await self._resolve_shared(
+            formatted_prompt, output_structure, main_model, use_model or "main", retry_attempts, use_cache
+        )
+
+    async def _resolve_shared(
+        self,
+        formatted_prompt: str,
+        output_structure: Type[BaseModel],
+        main_model: BaseChatModel,
+        model_id: str,
+        retry_attempts: int,
+        use_cache: bool
+    ) -> BaseModel:
+        """
+        Resolve a formatted prompt through the response cache and in-flight request sharing.
+
+        Identical concurrent requests await one shared task. Each caller waits on it
+        through asyncio.shield, and the task is cancelled only once every caller
+        waiting on it has been cancelled.
+
+        Args:
+            formatted_prompt: Fully formatted prompt message
+            output_structure: Pydantic model for structured output
+            main_model: LLM to try first
+            model_id: Key of main_model, used in the cache key
+            retry_attempts: Number of attempts on the main LLM
+            use_cache: Whether to use response caching
+
+        Returns:
+            Instance of output_structure
+        """
+        cache_key = self._get_cache_key(formatted_prompt, output_structure, model_id)
+        # Check cache if enabled
+        if use_cache:
+            cached_response = self._cache_get(cache_key)
+            if cached_response is not None:
+                LOGGER.info("Returning cached response")
+                return cached_response
+
+        # Join an identical request that is already in flight, or start one
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                self._resolve_one(formatted_prompt, output_structure, main_model, retry_attempts)
+            )
+            task.add_done_callback(lambda done: self._inflight_done(cache_key, done))
+            self._inflight[cache_key] = task
+            self._inflight_waiters[cache_key] = 0
+
+        self._inflight_waiters[cache_key] += 1
+        try:
+            response = await asyncio.shield(task)
+        finally:
+            if self._inflight.get(cache_key) is task:
+                self._inflight_waiters[cache_key] -= 1
+                if not self._inflight_waiters[cache_key] and not task.done():
+                    # Last waiter left; nobody needs the result any more
+                    del self._inflight[cache_key], self._inflight_waiters[cache_key]
+                    task.cancel()
+
+        if use_cache:
+            self._cache_put(cache_key, response)
+        return response
+
+    def _inflight_done(self, cache_key: str, task: asyncio.Task) -> None:
+        """Forget a finished shared request and mark its exception as retrieved."""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key], self._inflight_waiters[cache_key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _resolve_one(
+        self,
+        formatted_prompt: str,
+        output_structure: Type[BaseModel],
+        main_model: BaseChatModel,
+        retry_attempts: int
+    ) -> BaseModel:
+        """
+        Resolve a formatted prompt with retries on the main LLM, then the fallback LLM.
+
+        Args:
+            formatted_prompt: Fully formatted prompt message
+            output_structure: Pydantic model for structured output
+            main_model: LLM to try first
+            retry_attempts: Number of attempts on the main LLM
+
+        Returns:
+            Instance of output_structure
 
+        Raises:
+            LLMResponseError: If both main and fallback LLMs fail
+        """
         # Try main LLM with retries
         for attempt in range(1, retry_attempts + 1):
             # LOGGER.info(f"Attempt {attempt}/{retry_attempts} with main LLM")
@@ -277,12 +525,10 @@ class StructuredLLMHandler:
             )
 
             if status == LLMResponseStatus.SUCCESS and response:
-            #     if use_cache:
-            #         self._response_cache[cache_key] = (datetime.now().timestamp(), response)
                 return response
 
             if attempt < retry_attempts:
-                await asyncio.sleep(self._retry_delay)
+                await asyncio.sleep(self._backoff_delay(attempt))
 
         # Try fallback LLM
         LOGGER.warning("Main LLM failed, trying fallback LLM")
@@ -293,14 +539,70 @@ class StructuredLLMHandler:
         )
 
         if status == LLMResponseStatus.SUCCESS and response:
-            # if use_cache:
-            #     self._response_cache[cache_key] = (datetime.now().timestamp(), response)
             return response
 
         raise LLMResponseError(
             "Failed to get structured response from both main and fallback LLMs"
         )
 
-    # async def clear_cache(self) -> None:
-    #     """Clear the response cache"""
-    #     self._response_cache.clear()
\ No newline at end of file
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Exponential backoff with jitter for the given 1-based attempt number.
+
+        Args:
+            attempt: The attempt that just failed
+
+        Returns:
+            Seconds to wait before the next attempt, capped at _max_retry_delay
+        """
+        delay = self._retry_delay * (2 ** (attempt - 1)) + random.uniform(0, self._retry_delay * 0.5)
+        return min(delay, self._max_retry_delay)
+
+    async def get_structured_responses_batch(
+        self,
+        output_structure: Type[BaseModel],
+        prompt: str,
+        kwargs_list: List[Dict[str, Any]],
+        use_model: str = None,
+        retry_attempts: Optional[int] = None,
+        use_cache: bool = False
+    ) -> List[Union[BaseModel, Exception]]:
+        """
+        Get structured responses for several formattings of one prompt template concurrently.
+
+        Requests run through asyncio.gather, bounded by the handler's max_concurrency,
+        so results are returned in the same order as kwargs_list. Like
+        get_structured_response, duplicate prompts share one in-flight request.
+
+        Args:
+            output_structure: Pydantic model for structured output
+            prompt: Prompt template
+            kwargs_list: One dict of prompt formatting variables per request
+            use_model: Key of the LLM to use instead of the main LLM (optional)
+            retry_attempts: Number of retry attempts (optional)
+            use_cache: Whether to use response caching
+
+        Returns:
+            List with an output_structure instance, or the raised exception, per request
+
+        Raises:
+            PromptFormattingError: If formatting any of the prompts fails
+        """
+        retry_attempts = retry_attempts or self._max_retries
+        main_model = self._llm_dict[use_model] if use_model else self._main_llm
+        formatted_prompts = [self._format_prompt(prompt, output_structure, **kwargs) for kwargs in kwargs_list]
+
+        async def bounded(formatted_prompt: str) -> BaseModel:
+            async with self._batch_sem():
+                return await self._resolve_shared(
+                    formatted_prompt, output_structure, main_model, use_model or "main", retry_attempts, use_cache
+                )
+
+        return await asyncio.gather(
+            *(bounded(formatted_prompt) for formatted_prompt in formatted_prompts),
+            return_exceptions=True
+        )
+
+    async def clear_cache(self) -> None:
+        """Clear the response cache"""
+        self._response_cache.clear()
\ No newline at end of file
@@ -1,6 +1,6 @@
 import asyncio
-import json
 import logging
+import orjson
 import uuid
 from typing import Dict, List, Any, Optional, Callable
 from fastapi import WebSocket, WebSocketDisconnect
@@ -57,13 +57,17 @@ class ConnectionManager:
     async def send_message(self, message: Any, session_id: str):
         """Send message to FastAPI WebSocket clients"""
         if session_id in self.active_connections:
+            # Serialize once per call rather than once per connection
+            text = None
+            if isinstance(message, str):
+                text = message
+            elif isinstance(message, WebSocketMessage):
+                text = message.model_dump_json()
             disconnected = []
             for connection in self.active_connections[session_id]:
                 try:
-                    if isinstance(message, str):
-                        await connection.send_text(message)
-                    elif isinstance(message, WebSocketMessage):
-                        await connection.send_json(message.model_dump())
+                    if text is not None:
+                        await connection.send_text(text)
                     else:
                         await connection.send_json(message)
                     logger.debug(f"Message sent to session {session_id}")
@@ -118,7 +122,7 @@ class ConnectionManager:
     async def process_external_message(self, session_id: str, message: str):
         """Process messages from external WebSocket connections"""
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             message_type = data.get("type")
             content = data.get("content", {})
             request_id = data.get("request_id")
@@ -136,14 +140,15 @@ class ConnectionManager:
 
     async def send_external_message(self, message: WebSocketMessage, session_id: Optional[str] = None):
         """Send message to external WebSocket clients"""
+        payload = message.model_dump_json()
         if session_id and session_id in self.external_connections:
             websocket = self.external_connections[session_id]
-            await websocket.send(message.model_dump_json())
+            await websocket.send(payload)
             logger.debug(f"Message sent to external session {session_id}")
         else:
             # Broadcast to all external connections if no specific session_id
             for _, websocket in self.external_connections.items():
-                await websocket.send(message.model_dump_json())
+                await websocket.send(payload)
                 logger.debug("Message broadcast to all external sessions")
 
     async def broadcast_message(self, message: Any):
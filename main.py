@@ -389,6 +389,12 @@ async def lifespan(app: FastAPI):
             logger.error(f"Error closing browser agent: {str(e)}")
             logger.error(traceback.format_exc())
 
+    # Stop the Playwright driver shared by all stealth browsers
+    try:
+        await StealthBrowser.shutdown()
+    except Exception as e:
+        logger.error(f"Error stopping Playwright driver: {str(e)}")
+
 # Initialize FastAPI app
 app = FastAPI(lifespan=lifespan)
 